@@ -1,15 +1,46 @@
-from typing import Any, List, Optional
+"""Custom agents built from LangChain toolkits.
+
+Running these agents is I/O bound: every step waits on an LLM API, a database
+or a vector store, and there is no numeric kernel here for SIMD, GPU or
+quantization work to speed up. Latency is instead reduced by overlapping tool
+calls (see `executor.py`), caching what is rebuilt on every initialization
+(agents, prompts, database connections, parsed CSV files) and skipping
+redundant validation. Two environment variables, read on first use so a .env
+file loaded at startup applies, tune it:
+
+- LANGFLOW_AGENT_CONCURRENCY: worker threads in the shared tool pool
+  (default: min(32, 4 * CPU count)).
+- LANGFLOW_PROMPT_CACHE_SIZE: entries kept by each agent, database, tool and
+  prompt cache in this module, SQL prefixes included (default: 64). Parsed CSV
+  files are the exception: a dataframe can be large, so at most 8 are kept
+  whatever the setting.
+"""
+import atexit
+import functools
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from langchain import LLMChain
 from langchain.agents import (
-    AgentExecutor,
     Tool,
     ZeroShotAgent,
-    initialize_agent,
     AgentType,
 )
 from langchain.agents.agent_toolkits import (
-    SQLDatabaseToolkit,
     VectorStoreInfo,
     VectorStoreRouterToolkit,
     VectorStoreToolkit,
@@ -28,15 +59,314 @@ from langchain.agents.agent_toolkits.vectorstore.prompt import (
     ROUTER_PREFIX as VECTORSTORE_ROUTER_PREFIX,
 )
 from langchain.agents.mrkl.prompt import FORMAT_INSTRUCTIONS
+from langchain.agents.mrkl.prompt import SUFFIX as MRKL_SUFFIX
+from langchain.agents.types import AGENT_TO_CLASS
 from langchain.base_language import BaseLanguageModel
+from langchain.callbacks.manager import CallbackManagerForToolRun
 from langchain.memory.chat_memory import BaseChatMemory
+from langchain.prompts import BasePromptTemplate, PromptTemplate
 from langchain.sql_database import SQLDatabase
+from langchain.tools.base import BaseTool
 from langchain.tools.python.tool import PythonAstREPLTool
 from langchain.tools.sql_database.prompt import QUERY_CHECKER
+from langchain.tools.sql_database.tool import (
+    InfoSQLDatabaseTool,
+    ListSQLDatabaseTool,
+    QuerySQLDataBaseTool,
+)
+from langflow.cache.flow import InMemoryCache
+from langflow.interface.agents.executor import ParallelToolAgentExecutor
 from langflow.interface.base import CustomAgentExecutor
+from langflow.utils.logger import logger
+
+# Caches by name, created on first use:
+# - "agents": built executors keyed by the inputs they were built from. Each entry
+#   also keeps references to those inputs so ids used in the key can't be
+#   recycled while the entry is alive. Entries expire so rebuilt or deleted flows
+#   are released.
+# - "databases": reflected databases, expiring so new tables eventually show up
+# - "sql_tools": SQL tools keyed by (database_uri, id(llm)), stored with the llm
+#   for the same reason as agents
+# - "prompts": zero shot prompts keyed by the tools and text sections they are
+#   assembled from
+# - "sql_prefixes": SQL agent prefixes keyed by (dialect, top_k)
+_CACHES: Dict[str, InMemoryCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+_AGENT_TYPE_MAP: Dict[str, AgentType] = {
+    agent_type.value: agent_type for agent_type in AgentType
+}
+
+QUERY_CHECKER_PROMPT = PromptTemplate(
+    template=QUERY_CHECKER, input_variables=["query", "dialect"]
+)
+# A fenced code block, possibly surrounded by prose or left unclosed
+_SQL_FENCE = re.compile(r"```(?:sql)?\s*(.*?)(?:```|$)", re.DOTALL | re.IGNORECASE)
+
+_SPECULATIVE_POOL: Optional[ThreadPoolExecutor] = None
+_SPECULATIVE_POOL_LOCK = threading.Lock()
+
+
+def _get_cache(name: str) -> InMemoryCache:
+    """The named cache, sized from LANGFLOW_PROMPT_CACHE_SIZE when first used."""
+    with _CACHES_LOCK:
+        cache = _CACHES.get(name)
+        if cache is None:
+            max_size = int(os.getenv("LANGFLOW_PROMPT_CACHE_SIZE") or 64)
+            cache = _CACHES[name] = InMemoryCache(max_size=max_size)
+    return cache
+
+
+def _cache_key_part(value: Any) -> Any:
+    """Use the value itself when hashable, its identity otherwise."""
+    try:
+        hash(value)
+    except TypeError:
+        return id(value)
+    return value
+
+
+def _memoize_agent(func):
+    """Reuse the executor built by `func` when called again with the same inputs."""
+
+    @functools.wraps(func)
+    def wrapper(cls, *args, **kwargs):
+        key = (
+            cls,
+            func.__name__,
+            tuple(_cache_key_part(arg) for arg in args),
+            tuple(
+                sorted((name, _cache_key_part(value)) for name, value in kwargs.items())
+            ),
+        )
+        entry = _get_cache("agents").get(key)
+        if entry is None:
+            entry = (func(cls, *args, **kwargs), args, kwargs)
+            _get_cache("agents").set(key, entry)
+        return entry[0]
+
+    return wrapper
+
+
+def _get_database(database_uri: str) -> SQLDatabase:
+    """Connect to `database_uri` once and reuse the reflected database."""
+    db = _get_cache("databases").get(database_uri)
+    if db is None:
+        db = SQLDatabase.from_uri(database_uri)
+        _get_cache("databases").set(database_uri, db)
+    return db
+
+
+def _parse_csv(path: str, pandas_kwargs: dict):
+    import pandas as pd  # type: ignore
+
+    return pd.read_csv(path, **pandas_kwargs)
+
+
+# Not sized by LANGFLOW_PROMPT_CACHE_SIZE, dataframes can be large
+@functools.lru_cache(maxsize=8)
+def _read_csv_cached(path: str, mtime: float, pandas_kwargs: frozenset):
+    return _parse_csv(path, dict(pandas_kwargs))
+
+
+def _read_csv(path: str, pandas_kwargs: dict):
+    """Read a CSV file, reusing the parsed dataframe while the file is unchanged."""
+    try:
+        mtime = os.path.getmtime(path)
+        key = frozenset(pandas_kwargs.items())
+        hash(key)
+    except (OSError, TypeError):
+        # Not a local file (e.g. a URL) or unhashable pandas kwargs
+        return _parse_csv(path, pandas_kwargs)
+    df = _read_csv_cached(path, mtime, key)
+    # The agent's REPL can modify df in place, keep the cached one untouched
+    return df.copy()
+
+
+def _clean_sql(query: str) -> str:
+    """Strip markdown fences, whitespace and the trailing semicolon from a query.
+
+    If the query is wrapped in prose, only the fenced block is kept.
+    """
+    fenced = _SQL_FENCE.search(query)
+    if fenced:
+        query = fenced.group(1)
+    return query.strip().rstrip(";").strip()
+
+
+def _is_single_select(query: str) -> bool:
+    """Whether the query is a single plain SELECT, safe to run before checking."""
+    query = _clean_sql(query)
+    words = query.lower().split()
+    return (
+        bool(words)
+        and words[0] == "select"
+        and "into" not in words
+        and ";" not in query
+    )
+
+
+def _get_speculative_pool() -> ThreadPoolExecutor:
+    """Threads that run SELECTs while the query checker reviews them.
+
+    The query tool itself runs in the tool pool and waits on the speculative
+    query, so submitting it to that same pool could deadlock once every worker
+    is waiting.
+    """
+    global _SPECULATIVE_POOL
+    with _SPECULATIVE_POOL_LOCK:
+        if _SPECULATIVE_POOL is None:
+            _SPECULATIVE_POOL = ThreadPoolExecutor(thread_name_prefix="langflow-sql")
+            atexit.register(_SPECULATIVE_POOL.shutdown)
+    return _SPECULATIVE_POOL
+
+
+def _same_query(query: str, other: str) -> bool:
+    return " ".join(_clean_sql(query).split()) == " ".join(_clean_sql(other).split())
+
+
+class SpeculativeQuerySQLDataBaseTool(QuerySQLDataBaseTool):
+    """Query tool that checks every query before returning its result.
+
+    A single SELECT is run while the query checker reviews it. If the checker
+    rewrites it into another single SELECT, the speculative result is discarded
+    and the corrected query is run instead. Any other query is checked first and
+    only the checked query is run, as the separate checker tool did before.
+    """
+
+    description = """
+    Input to this tool is a detailed and correct SQL query, output is a result from the database.
+    The query is checked for common mistakes before it is run, and corrected if needed.
+    If the query is not correct, an error message will be returned.
+    If an error is returned, rewrite the query and try again.
+    """
+    llm_chain: LLMChain
+
+    def _check_query(
+        self, query: str, run_manager: Optional[CallbackManagerForToolRun]
+    ) -> str:
+        checked_query = self.llm_chain.predict(
+            query=query,
+            dialect=self.db.dialect,
+            callbacks=run_manager.get_child() if run_manager else None,
+        )
+        return _clean_sql(checked_query)
+
+    def _run_checked(self, query: str, checked_query: str) -> str:
+        result = self.db.run_no_throw(checked_query)
+        if _same_query(checked_query, query):
+            return result
+        return "The query was corrected to: %s\n%s" % (checked_query, result)
+
+    def _run(
+        self,
+        query: str,
+        run_manager: Optional[CallbackManagerForToolRun] = None,
+    ) -> str:
+        if not _is_single_select(query):
+            # Only a plain SELECT is safe to run before it has been checked
+            try:
+                checked_query = self._check_query(query, run_manager)
+            except Exception as exc:
+                logger.error("Error checking SQL query: %s", exc)
+                return "Error checking SQL query: %s" % exc
+            return self._run_checked(query, checked_query)
+
+        speculative = _get_speculative_pool().submit(self.db.run_no_throw, query)
+        try:
+            checked_query = self._check_query(query, run_manager)
+        except Exception as exc:
+            logger.error("Error checking SQL query: %s", exc)
+            return speculative.result()
+
+        if _same_query(checked_query, query) or not _is_single_select(checked_query):
+            # Also covers checker replies that aren't a usable query on their own
+            return speculative.result()
+        speculative.cancel()
+        return self._run_checked(query, checked_query)
+
+
+def _make_llm_chain(llm: BaseLanguageModel, prompt: BasePromptTemplate) -> LLMChain:
+    """Build an LLMChain without running pydantic validation.
+
+    Both arguments are already validated objects, and every other LLMChain field
+    has a default, so validating them again only costs time (and copies).
+    """
+    return LLMChain.construct(llm=llm, prompt=prompt)
+
+
+def _sql_prefix(dialect: str, top_k: int) -> str:
+    key = (dialect, top_k)
+    prefix = _get_cache("sql_prefixes").get(key)
+    if prefix is None:
+        # The query tool checks queries itself, don't ask the agent to do it too
+        prefix = SQL_PREFIX.replace(
+            "You MUST double check your query before executing it. ", ""
+        ).format(dialect=dialect, top_k=top_k)
+        _get_cache("sql_prefixes").set(key, prefix)
+    return prefix
+
+
+def _get_sql_tools(database_uri: str, llm: BaseLanguageModel) -> Tuple[BaseTool, ...]:
+    """Build the SQL tools for `database_uri` once per database and LLM."""
+    key = (database_uri, id(llm))
+    entry = _get_cache("sql_tools").get(key)
+    if entry is None:
+        db = _get_database(database_uri)
+        llmchain = _make_llm_chain(llm, QUERY_CHECKER_PROMPT)
+        tools = (
+            SpeculativeQuerySQLDataBaseTool(db=db, llm_chain=llmchain),  # type: ignore
+            InfoSQLDatabaseTool(db=db),  # type: ignore
+            ListSQLDatabaseTool(db=db),  # type: ignore
+        )
+        entry = (tools, llm)
+        _get_cache("sql_tools").set(key, entry)
+    return entry[0]
+
+
+def _get_tool_names(tools: Iterable[BaseTool]) -> FrozenSet[str]:
+    """Names of the tools the agent is allowed to call."""
+    return frozenset(tool.name for tool in tools)
+
+
+def _create_prompt(
+    tools: Sequence[BaseTool],
+    prefix: str,
+    suffix: str = MRKL_SUFFIX,
+    format_instructions: str = FORMAT_INSTRUCTIONS,
+    input_variables: Optional[List[str]] = None,
+) -> PromptTemplate:
+    """Build a zero shot prompt with every static section ahead of the inputs.
+
+    The prefix, tool descriptions, format instructions and any partial data
+    (e.g. the dataframe preview) come first and `{input}`/`{agent_scratchpad}`
+    last, so consecutive calls share the longest possible prompt prefix and
+    providers that cache prompt prefixes (e.g. OpenAI) can reuse it.
+
+    The prompt only depends on the tools' names and descriptions and the
+    sections passed in, so it is assembled once per distinct combination.
+    """
+    key = (
+        tuple((tool.name, tool.description) for tool in tools),
+        prefix,
+        suffix,
+        format_instructions,
+        tuple(input_variables) if input_variables is not None else None,
+    )
+    prompt = _get_cache("prompts").get(key)
+    if prompt is None:
+        prompt = ZeroShotAgent.create_prompt(
+            tools,
+            prefix=prefix,
+            suffix=suffix,
+            format_instructions=format_instructions,
+            input_variables=input_variables,
+        )
+        _get_cache("prompts").set(key, prompt)
+    return prompt
 
 
-class JsonAgent(CustomAgentExecutor):
+class JsonAgent(ParallelToolAgentExecutor, CustomAgentExecutor):
     """Json agent"""
 
     @staticmethod
@@ -44,27 +374,31 @@ class JsonAgent(CustomAgentExecutor):
         return "JsonAgent"
 
     @classmethod
-    def initialize(cls, *args, **kwargs):
-        return cls.from_toolkit_and_llm(*args, **kwargs)
+    def initialize(
+        cls, toolkit: Union[JsonToolkit, List[BaseTool]], llm: BaseLanguageModel
+    ):
+        if isinstance(toolkit, list):
+            return cls.from_tools_and_llm(toolkit, llm)
+        return cls.from_toolkit_and_llm(toolkit, llm)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
     @classmethod
+    @_memoize_agent
     def from_toolkit_and_llm(cls, toolkit: JsonToolkit, llm: BaseLanguageModel):
-        tools = toolkit if isinstance(toolkit, list) else toolkit.get_tools()
-        tool_names = {tool.name for tool in tools}
-        prompt = ZeroShotAgent.create_prompt(
-            tools,
-            prefix=JSON_PREFIX,
-            suffix=JSON_SUFFIX,
-            format_instructions=FORMAT_INSTRUCTIONS,
-            input_variables=None,
-        )
-        llm_chain = LLMChain(
-            llm=llm,
-            prompt=prompt,
-        )
+        return cls._from_tools_and_llm(toolkit.get_tools(), llm)
+
+    @classmethod
+    @_memoize_agent
+    def from_tools_and_llm(cls, tools: List[BaseTool], llm: BaseLanguageModel):
+        return cls._from_tools_and_llm(tools, llm)
+
+    @classmethod
+    def _from_tools_and_llm(cls, tools: List[BaseTool], llm: BaseLanguageModel):
+        tool_names = _get_tool_names(tools)
+        prompt = _create_prompt(tools, prefix=JSON_PREFIX, suffix=JSON_SUFFIX)
+        llm_chain = _make_llm_chain(llm, prompt)
         agent = ZeroShotAgent(
             llm_chain=llm_chain, allowed_tools=tool_names  # type: ignore
         )
@@ -74,7 +408,7 @@ class JsonAgent(CustomAgentExecutor):
         return super().run(*args, **kwargs)
 
 
-class CSVAgent(CustomAgentExecutor):
+class CSVAgent(ParallelToolAgentExecutor, CustomAgentExecutor):
     """CSV agent"""
 
     @staticmethod
@@ -96,24 +430,23 @@ class CSVAgent(CustomAgentExecutor):
         pandas_kwargs: Optional[dict] = None,
         **kwargs: Any
     ):
-        import pandas as pd  # type: ignore
-
         _kwargs = pandas_kwargs or {}
-        df = pd.read_csv(path, **_kwargs)
+        df = _read_csv(path, _kwargs)
 
         tools = [PythonAstREPLTool(locals={"df": df})]  # type: ignore
-        prompt = ZeroShotAgent.create_prompt(
+        prompt = _create_prompt(
             tools,
             prefix=PANDAS_PREFIX,
             suffix=PANDAS_SUFFIX,
-            input_variables=["df", "input", "agent_scratchpad"],
+            input_variables=["df_head", "input", "agent_scratchpad"],
         )
-        partial_prompt = prompt.partial(df=str(df.head()))
-        llm_chain = LLMChain(
-            llm=llm,
-            prompt=partial_prompt,
+        # Wide frames would otherwise put thousands of characters in every call
+        df_preview = df.head().to_string(
+            max_cols=8, max_colwidth=32, show_dimensions=False
         )
-        tool_names = {tool.name for tool in tools}
+        partial_prompt = prompt.partial(df_head=df_preview[:2048])
+        llm_chain = _make_llm_chain(llm, partial_prompt)
+        tool_names = _get_tool_names(tools)
         agent = ZeroShotAgent(
             llm_chain=llm_chain, allowed_tools=tool_names, **kwargs  # type: ignore
         )
@@ -139,6 +472,7 @@ class VectorStoreAgent(CustomAgentExecutor):
         super().__init__(*args, **kwargs)
 
     @classmethod
+    @_memoize_agent
     def from_toolkit_and_llm(
         cls, llm: BaseLanguageModel, vectorstoreinfo: VectorStoreInfo, **kwargs: Any
     ):
@@ -147,16 +481,13 @@ class VectorStoreAgent(CustomAgentExecutor):
         toolkit = VectorStoreToolkit(vectorstore_info=vectorstoreinfo, llm=llm)
 
         tools = toolkit.get_tools()
-        prompt = ZeroShotAgent.create_prompt(tools, prefix=VECTORSTORE_PREFIX)
-        llm_chain = LLMChain(
-            llm=llm,
-            prompt=prompt,
-        )
-        tool_names = {tool.name for tool in tools}
+        prompt = _create_prompt(tools, prefix=VECTORSTORE_PREFIX)
+        llm_chain = _make_llm_chain(llm, prompt)
+        tool_names = _get_tool_names(tools)
         agent = ZeroShotAgent(
             llm_chain=llm_chain, allowed_tools=tool_names, **kwargs  # type: ignore
         )
-        return AgentExecutor.from_agent_and_tools(
+        return ParallelToolAgentExecutor.from_agent_and_tools(
             agent=agent, tools=tools, verbose=True, handle_parsing_errors=True
         )
 
@@ -179,54 +510,30 @@ class SQLAgent(CustomAgentExecutor):
         super().__init__(*args, **kwargs)
 
     @classmethod
+    @_memoize_agent
     def from_toolkit_and_llm(
         cls, llm: BaseLanguageModel, database_uri: str, **kwargs: Any
     ):
         """Construct an SQL agent from an LLM and tools."""
-        db = SQLDatabase.from_uri(database_uri)
-        toolkit = SQLDatabaseToolkit(db=db, llm=llm)
+        db = _get_database(database_uri)
 
         # The right code should be this, but there is a problem with tools = toolkit.get_tools()
         # related to `OPENAI_API_KEY`
         # return create_sql_agent(llm=llm, toolkit=toolkit, verbose=True)
-        from langchain.prompts import PromptTemplate
-        from langchain.tools.sql_database.tool import (
-            InfoSQLDatabaseTool,
-            ListSQLDatabaseTool,
-            QuerySQLCheckerTool,
-            QuerySQLDataBaseTool,
-        )
-
-        llmchain = LLMChain(
-            llm=llm,
-            prompt=PromptTemplate(
-                template=QUERY_CHECKER, input_variables=["query", "dialect"]
-            ),
-        )
+        tools = list(_get_sql_tools(database_uri, llm))
 
-        tools = [
-            QuerySQLDataBaseTool(db=db),  # type: ignore
-            InfoSQLDatabaseTool(db=db),  # type: ignore
-            ListSQLDatabaseTool(db=db),  # type: ignore
-            QuerySQLCheckerTool(db=db, llm_chain=llmchain, llm=llm),  # type: ignore
-        ]
-
-        prefix = SQL_PREFIX.format(dialect=toolkit.dialect, top_k=10)
-        prompt = ZeroShotAgent.create_prompt(
-            tools=tools,  # type: ignore
+        prefix = _sql_prefix(db.dialect, 10)
+        prompt = _create_prompt(
+            tools,  # type: ignore
             prefix=prefix,
             suffix=SQL_SUFFIX,
-            format_instructions=FORMAT_INSTRUCTIONS,
-        )
-        llm_chain = LLMChain(
-            llm=llm,
-            prompt=prompt,
         )
-        tool_names = {tool.name for tool in tools}  # type: ignore
+        llm_chain = _make_llm_chain(llm, prompt)
+        tool_names = _get_tool_names(tools)
         agent = ZeroShotAgent(
             llm_chain=llm_chain, allowed_tools=tool_names, **kwargs  # type: ignore
         )
-        return AgentExecutor.from_agent_and_tools(
+        return ParallelToolAgentExecutor.from_agent_and_tools(
             agent=agent,
             tools=tools,  # type: ignore
             verbose=True,
@@ -247,36 +554,51 @@ class VectorStoreRouterAgent(CustomAgentExecutor):
         return "VectorStoreRouterAgent"
 
     @classmethod
-    def initialize(cls, *args, **kwargs):
-        return cls.from_toolkit_and_llm(*args, **kwargs)
+    def initialize(
+        cls,
+        llm: BaseLanguageModel,
+        vectorstoreroutertoolkit: Union[VectorStoreRouterToolkit, List[BaseTool]],
+        **kwargs: Any
+    ):
+        if isinstance(vectorstoreroutertoolkit, list):
+            return cls.from_tools_and_llm(llm, vectorstoreroutertoolkit, **kwargs)
+        return cls.from_toolkit_and_llm(llm, vectorstoreroutertoolkit, **kwargs)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
     @classmethod
+    @_memoize_agent
     def from_toolkit_and_llm(
         cls,
         llm: BaseLanguageModel,
         vectorstoreroutertoolkit: VectorStoreRouterToolkit,
         **kwargs: Any
+    ):
+        """Construct a vector store router agent from an LLM and a toolkit."""
+        return cls._from_tools_and_llm(
+            llm, vectorstoreroutertoolkit.get_tools(), **kwargs
+        )
+
+    @classmethod
+    @_memoize_agent
+    def from_tools_and_llm(
+        cls, llm: BaseLanguageModel, tools: List[BaseTool], **kwargs: Any
     ):
         """Construct a vector store router agent from an LLM and tools."""
+        return cls._from_tools_and_llm(llm, tools, **kwargs)
 
-        tools = (
-            vectorstoreroutertoolkit
-            if isinstance(vectorstoreroutertoolkit, list)
-            else vectorstoreroutertoolkit.get_tools()
-        )
-        prompt = ZeroShotAgent.create_prompt(tools, prefix=VECTORSTORE_ROUTER_PREFIX)
-        llm_chain = LLMChain(
-            llm=llm,
-            prompt=prompt,
-        )
-        tool_names = {tool.name for tool in tools}
+    @classmethod
+    def _from_tools_and_llm(
+        cls, llm: BaseLanguageModel, tools: List[BaseTool], **kwargs: Any
+    ):
+        prompt = _create_prompt(tools, prefix=VECTORSTORE_ROUTER_PREFIX)
+        llm_chain = _make_llm_chain(llm, prompt)
+        tool_names = _get_tool_names(tools)
         agent = ZeroShotAgent(
             llm_chain=llm_chain, allowed_tools=tool_names, **kwargs  # type: ignore
         )
-        return AgentExecutor.from_agent_and_tools(
+        return ParallelToolAgentExecutor.from_agent_and_tools(
             agent=agent, tools=tools, verbose=True, handle_parsing_errors=True
         )
 
@@ -300,14 +622,16 @@ class InitializeAgent(CustomAgentExecutor):
         memory: Optional[BaseChatMemory] = None,
     ):
         # Find which value in the AgentType enum corresponds to the string
-        # passed in as agent
-        agent = AgentType(agent)
-        return initialize_agent(
+        # passed in as agent. Unknown values still raise from AgentType.
+        agent = _AGENT_TYPE_MAP.get(agent) or AgentType(agent)
+        # Same as langchain's initialize_agent, but with an executor that runs
+        # the tools of a multi-action step concurrently
+        agent_obj = AGENT_TO_CLASS[agent].from_llm_and_tools(llm, tools)
+        return ParallelToolAgentExecutor.from_agent_and_tools(
+            agent=agent_obj,
             tools=tools,
-            llm=llm,
-            # LangChain now uses Enum for agent, but we still support string
-            agent=agent,  # type: ignore
             memory=memory,
+            tags=[agent.value],
             return_intermediate_steps=True,
             handle_parsing_errors=True,
         )
@@ -319,11 +643,14 @@ class InitializeAgent(CustomAgentExecutor):
         return super().run(*args, **kwargs)
 
 
-CUSTOM_AGENTS = {
-    "JsonAgent": JsonAgent,
-    "CSVAgent": CSVAgent,
-    "AgentInitializer": InitializeAgent,
-    "VectorStoreAgent": VectorStoreAgent,
-    "VectorStoreRouterAgent": VectorStoreRouterAgent,
-    "SQLAgent": SQLAgent,
-}
+# Read-only: the registry is shared by every flow in the process
+CUSTOM_AGENTS = MappingProxyType(
+    {
+        "JsonAgent": JsonAgent,
+        "CSVAgent": CSVAgent,
+        "AgentInitializer": InitializeAgent,
+        "VectorStoreAgent": VectorStoreAgent,
+        "VectorStoreRouterAgent": VectorStoreRouterAgent,
+        "SQLAgent": SQLAgent,
+    }
+)
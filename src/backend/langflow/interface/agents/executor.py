@@ -0,0 +1,267 @@
+import asyncio
+import atexit
+import functools
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from inspect import signature
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from langchain.agents import AgentExecutor
+from langchain.callbacks.base import AsyncCallbackHandler, BaseCallbackHandler
+from langchain.callbacks.manager import (
+    AsyncCallbackManagerForChainRun,
+    AsyncCallbackManagerForToolRun,
+    CallbackManagerForChainRun,
+    CallbackManagerForToolRun,
+)
+from langchain.schema import AgentAction, AgentFinish
+from langchain.tools.base import BaseTool
+from pydantic import PrivateAttr
+
+# Shared by every executor so concurrent flows don't each spin up their own threads
+_TOOL_POOL: Optional[ThreadPoolExecutor] = None
+_TOOL_POOL_LOCK = threading.Lock()
+
+
+def get_tool_pool() -> ThreadPoolExecutor:
+    """The thread pool agents use to run blocking tool calls.
+
+    Created on first use, after a .env file setting LANGFLOW_AGENT_CONCURRENCY
+    has been loaded.
+    """
+    global _TOOL_POOL
+    with _TOOL_POOL_LOCK:
+        if _TOOL_POOL is None:
+            max_workers = int(
+                os.getenv("LANGFLOW_AGENT_CONCURRENCY")
+                or min(32, (os.cpu_count() or 4) * 4)
+            )
+            _TOOL_POOL = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="langflow-tool"
+            )
+            atexit.register(_TOOL_POOL.shutdown)
+    return _TOOL_POOL
+
+
+class _DeferredTool:
+    """Stands in for a tool so a step records its tool calls without running them."""
+
+    def __init__(self, tool: BaseTool):
+        self.tool = tool
+        self.return_direct = tool.return_direct
+
+    def run(self, *args, **kwargs) -> functools.partial:
+        return functools.partial(self.tool.run, *args, **kwargs)
+
+
+class _LoopCallbackHandler:
+    """Lets sync code in a worker thread report to an async callback handler.
+
+    The sync callback manager would call the handler's coroutines without
+    awaiting them, so each event is scheduled on the event loop instead.
+    """
+
+    def __init__(self, handler: AsyncCallbackHandler, loop: asyncio.AbstractEventLoop):
+        self.handler = handler
+        self.loop = loop
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.handler, name)
+        if not name.startswith("on_"):
+            # ignore_* flags, raise_error, ...
+            return attr
+
+        def call_on_loop(*args: Any, **kwargs: Any) -> Any:
+            coro = attr(*args, **kwargs)
+            return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+        return call_on_loop
+
+
+def _to_sync_run_manager(
+    run_manager: AsyncCallbackManagerForToolRun, loop: asyncio.AbstractEventLoop
+) -> CallbackManagerForToolRun:
+    def bridge(handlers: List[BaseCallbackHandler]) -> List[BaseCallbackHandler]:
+        return [
+            _LoopCallbackHandler(handler, loop)  # type: ignore
+            if isinstance(handler, AsyncCallbackHandler)
+            else handler
+            for handler in handlers
+        ]
+
+    return CallbackManagerForToolRun(
+        run_id=run_manager.run_id,
+        handlers=bridge(run_manager.handlers),
+        inheritable_handlers=bridge(run_manager.inheritable_handlers),
+        parent_run_id=run_manager.parent_run_id,
+        tags=run_manager.tags,
+        inheritable_tags=run_manager.inheritable_tags,
+        metadata=run_manager.metadata,
+        inheritable_metadata=run_manager.inheritable_metadata,
+    )
+
+
+def _accepts_run_manager(method: Any) -> bool:
+    return signature(method).parameters.get("run_manager") is not None
+
+
+class _ThreadedTool(BaseTool):
+    """Async view of a tool that runs its sync implementation in the tool pool.
+
+    Most tools used by the agents here (SQL, vector store QA) raise
+    NotImplementedError from `_arun`. The wrapper tries the tool's own `_arun`
+    first and, once it turns out to be missing, runs `_run` in a worker thread
+    with a run manager that forwards callbacks to the event loop.
+    """
+
+    # Not typed as BaseTool so pydantic doesn't copy the wrapped tool
+    tool: Any
+    _sync_only: bool = PrivateAttr(default=False)
+
+    @classmethod
+    def wrap(cls, tool: BaseTool) -> BaseTool:
+        if getattr(tool, "coroutine", None) is not None:
+            # Tool and StructuredTool built with a coroutine are already async
+            return tool
+        return cls(
+            tool=tool,
+            name=tool.name,
+            description=tool.description,
+            return_direct=tool.return_direct,
+            verbose=tool.verbose,
+            callbacks=tool.callbacks,
+            tags=tool.tags,
+            metadata=tool.metadata,
+            handle_tool_error=tool.handle_tool_error,
+        )
+
+    def _parse_input(self, tool_input: Union[str, Dict]) -> Union[str, Dict]:
+        return self.tool._parse_input(tool_input)
+
+    def _to_args_and_kwargs(self, tool_input: Union[str, Dict]) -> Tuple[Tuple, Dict]:
+        return self.tool._to_args_and_kwargs(tool_input)
+
+    def _run(self, *args: Any, **kwargs: Any) -> Any:
+        return self.tool._run(*args, **kwargs)
+
+    async def _arun(
+        self,
+        *args: Any,
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+        **kwargs: Any,
+    ) -> Any:
+        if not self._sync_only:
+            if run_manager is not None and _accepts_run_manager(self.tool._arun):
+                kwargs_with_manager = dict(kwargs, run_manager=run_manager)
+            else:
+                kwargs_with_manager = kwargs
+            try:
+                return await self.tool._arun(*args, **kwargs_with_manager)
+            except NotImplementedError:
+                self._sync_only = True
+
+        loop = asyncio.get_running_loop()
+        if run_manager is not None and _accepts_run_manager(self.tool._run):
+            kwargs = dict(kwargs, run_manager=_to_sync_run_manager(run_manager, loop))
+        return await loop.run_in_executor(
+            get_tool_pool(), functools.partial(self.tool._run, *args, **kwargs)
+        )
+
+
+def _get_observation(future: Future) -> str:
+    """Turn a failed tool call into an observation instead of failing the step."""
+    try:
+        return future.result()
+    except Exception as exc:
+        return f"{type(exc).__name__}: {exc}"
+
+
+class ParallelToolAgentExecutor(AgentExecutor):
+    """AgentExecutor that runs the tool calls of a multi-action step concurrently
+
+    The async path (`acall`, used by the chat endpoint) runs sync-only tools in
+    the shared pool, so it no longer fails and falls back to a blocking call.
+    AgentExecutor already gathers the tool calls of a step there.
+    """
+
+    # Tool name -> (tool, async wrapper), reused across steps and runs
+    _threaded_tools: Dict[str, Tuple[BaseTool, BaseTool]] = PrivateAttr(
+        default_factory=dict
+    )
+
+    def _get_threaded_tool(self, tool: BaseTool) -> BaseTool:
+        cached = self._threaded_tools.get(tool.name)
+        if cached is not None and cached[0] is tool:
+            return cached[1]
+        threaded = _ThreadedTool.wrap(tool)
+        self._threaded_tools[tool.name] = (tool, threaded)
+        return threaded
+
+    def _take_next_step(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        inputs: Dict[str, str],
+        intermediate_steps: List[Tuple[AgentAction, str]],
+        run_manager: Optional[CallbackManagerForChainRun] = None,
+    ) -> Union[AgentFinish, List[Tuple[AgentAction, str]]]:
+        deferred_tools = {
+            name: _DeferredTool(tool) for name, tool in name_to_tool_map.items()
+        }
+        output = super()._take_next_step(
+            deferred_tools,  # type: ignore
+            color_mapping,
+            inputs,
+            intermediate_steps,
+            run_manager=run_manager,
+        )
+        if isinstance(output, AgentFinish):
+            return output
+
+        pending = [
+            observation
+            for _, observation in output
+            if isinstance(observation, functools.partial)
+        ]
+        if len(pending) <= 1:
+            # Nothing to overlap, run inline exactly like AgentExecutor does
+            return [
+                (action, observation())
+                if isinstance(observation, functools.partial)
+                else (action, observation)
+                for action, observation in output
+            ]
+
+        futures: List[Tuple[AgentAction, Union[Future, str]]] = [
+            (action, get_tool_pool().submit(observation))
+            if isinstance(observation, functools.partial)
+            else (action, observation)
+            for action, observation in output
+        ]
+        return [
+            (action, _get_observation(observation))
+            if isinstance(observation, Future)
+            else (action, observation)
+            for action, observation in futures
+        ]
+
+    async def _atake_next_step(
+        self,
+        name_to_tool_map: Dict[str, BaseTool],
+        color_mapping: Dict[str, str],
+        inputs: Dict[str, str],
+        intermediate_steps: List[Tuple[AgentAction, str]],
+        run_manager: Optional[AsyncCallbackManagerForChainRun] = None,
+    ) -> Union[AgentFinish, List[Tuple[AgentAction, str]]]:
+        threaded_tools = {
+            name: self._get_threaded_tool(tool)
+            for name, tool in name_to_tool_map.items()
+        }
+        return await super()._atake_next_step(
+            threaded_tools,
+            color_mapping,
+            inputs,
+            intermediate_steps,
+            run_manager=run_manager,
+        )
@@ -0,0 +1,295 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, List
+
+from langchain.agents import BaseMultiActionAgent, Tool
+from langchain.callbacks.base import AsyncCallbackHandler
+from langchain.llms.fake import FakeListLLM
+from langchain.schema import AgentAction, AgentFinish
+from langflow.interface.agents import custom
+from langflow.interface.agents.executor import ParallelToolAgentExecutor
+
+
+class FakeMultiActionAgent(BaseMultiActionAgent):
+    """Plans `actions` once, then finishes with the observations."""
+
+    actions: List[Any]
+
+    @property
+    def input_keys(self):
+        return ["input"]
+
+    def plan(self, intermediate_steps, callbacks=None, **kwargs):
+        if intermediate_steps:
+            observations = [observation for _, observation in intermediate_steps]
+            return AgentFinish({"output": observations}, "")
+        return self.actions
+
+    async def aplan(self, intermediate_steps, callbacks=None, **kwargs):
+        return self.plan(intermediate_steps, callbacks=callbacks, **kwargs)
+
+
+class RecordingHandler(AsyncCallbackHandler):
+    def __init__(self):
+        self.events = []
+
+    async def on_tool_start(self, serialized, input_str, **kwargs):
+        self.events.append("on_tool_start")
+
+    async def on_llm_start(self, serialized, prompts, **kwargs):
+        self.events.append("on_llm_start")
+
+
+def _build_executor(tools, actions):
+    return ParallelToolAgentExecutor.from_agent_and_tools(
+        agent=FakeMultiActionAgent(actions=actions), tools=tools
+    )
+
+
+def _take_step(tools, actions):
+    executor = _build_executor(tools, actions)
+    return executor._take_next_step(
+        {tool.name: tool for tool in tools},
+        {tool.name: "blue" for tool in tools},
+        {"input": "question"},
+        [],
+    )
+
+
+def test_memoize_agent_reuses_executor():
+    calls = []
+
+    class FakeAgent:
+        @classmethod
+        @custom._memoize_agent
+        def from_toolkit_and_llm(cls, toolkit, llm, **kwargs):
+            calls.append((toolkit, llm))
+            return object()
+
+    toolkit, llm = [], {}
+    first = FakeAgent.from_toolkit_and_llm(toolkit, llm, verbose=True)
+    second = FakeAgent.from_toolkit_and_llm(toolkit, llm, verbose=True)
+    assert first is second
+    assert len(calls) == 1
+
+    # Different (unhashable) inputs build a new executor
+    third = FakeAgent.from_toolkit_and_llm([], llm, verbose=True)
+    assert third is not first
+    assert len(calls) == 2
+
+
+def test_read_csv_reuses_parsed_frame(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("a,b\n1,2\n")
+
+    df = custom._read_csv(str(path), {})
+    df["a"] = 10
+    # The cached frame is not affected by changes made to a returned copy
+    assert custom._read_csv(str(path), {})["a"].tolist() == [1]
+
+    path.write_text("a,b\n3,4\n")
+    os.utime(path, (os.path.getatime(path), os.path.getmtime(path) + 10))
+    assert custom._read_csv(str(path), {})["a"].tolist() == [3]
+
+
+def test_read_csv_keeps_dates_as_strings(tmp_path):
+    path = tmp_path / "dates.csv"
+    path.write_text("date,value\n2023-01-05,1\n2023-02-10,2\n")
+
+    df = custom._read_csv(str(path), {})
+    # Generated agent code relies on the default engine's dtypes
+    assert df["date"].str[:4].tolist() == ["2023", "2023"]
+
+
+def test_csv_agent_builds_and_runs(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("name,value\nalpha,1\nbeta,2\n")
+
+    llm = FakeListLLM(responses=["Thought: I know it\nFinal Answer: 2 rows"])
+    agent = custom.CSVAgent.initialize(path=str(path), llm=llm)
+    prompt = agent.agent.llm_chain.prompt
+    assert "alpha" in prompt.partial_variables["df_head"]
+    assert agent.run("How many rows are there?") == "2 rows"
+
+
+def test_speculative_sql_only_for_single_select():
+    assert custom._is_single_select("SELECT name FROM users LIMIT 5;")
+    assert custom._is_single_select("```sql\nselect * from users\n```")
+    assert not custom._is_single_select("DELETE FROM users")
+    assert not custom._is_single_select("SELECT * INTO backup FROM users")
+    assert not custom._is_single_select("SELECT 1; DROP TABLE users")
+    assert custom._clean_sql("```sql\nSELECT 1;\n```") == "SELECT 1"
+    assert custom._clean_sql("Looks good:\n```sql\nSELECT 1\n```\n") == "SELECT 1"
+
+
+class FakeDatabase:
+    dialect = "sqlite"
+
+    def __init__(self):
+        self.queries = []
+
+    def run_no_throw(self, query):
+        self.queries.append(query)
+        return "rows for " + query
+
+
+class FakeChecker:
+    def __init__(self, reply):
+        self.reply = reply
+        self.checked = []
+
+    def predict(self, query, **kwargs):
+        self.checked.append(query)
+        return self.reply
+
+
+def _run_checked_query(query, reply):
+    db = FakeDatabase()
+    checker = FakeChecker(reply)
+    tool = custom.SpeculativeQuerySQLDataBaseTool.construct(db=db, llm_chain=checker)
+    observation = tool._run(query)
+    assert checker.checked == [query]
+    return observation, db.queries
+
+
+def test_speculative_sql_keeps_unchanged_query():
+    query = "SELECT name FROM users LIMIT 5"
+    observation, queries = _run_checked_query(query, "```sql\n" + query + ";\n```")
+    assert observation == "rows for " + query
+    assert queries == [query]
+
+
+def test_speculative_sql_ignores_unusable_checker_reply():
+    query = "SELECT name FROM users LIMIT 5"
+    observation, queries = _run_checked_query(query, "DROP TABLE users")
+    assert observation == "rows for " + query
+    assert queries == [query]
+
+
+def test_speculative_sql_reports_rewritten_query():
+    query = "SELECT name FROM user LIMIT 5"
+    fixed = "SELECT name FROM users LIMIT 5"
+    observation, queries = _run_checked_query(
+        query, "Fixed:\n```sql\n" + fixed + "\n```"
+    )
+    assert fixed in observation
+    assert observation.endswith("rows for " + fixed)
+    assert fixed in queries
+
+
+def test_sql_checks_other_queries_before_running_them():
+    queries = [
+        "WITH u AS (SELECT name FROM users) SELECT name FROM u",
+        "(SELECT name FROM users)",
+        "SELECT name FROM users WHERE note = 'a;b'",
+        "UPDATE users SET name = 'a'",
+    ]
+    for query in queries:
+        observation, ran = _run_checked_query(query, "```sql\n" + query + "\n```")
+        assert observation == "rows for " + query
+        assert ran == [query]
+
+    fixed = "UPDATE users SET name = 'b'"
+    observation, ran = _run_checked_query("UPDATE users SET nam = 'b'", fixed)
+    assert observation == "The query was corrected to: " + fixed + "\nrows for " + fixed
+    # The original statement is never run
+    assert ran == [fixed]
+
+
+def test_parallel_executor_keeps_planned_order():
+    # Both calls must be in flight at the same time to get past the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    def slow(query):
+        barrier.wait()
+        time.sleep(0.05)
+        return "slow " + query
+
+    def fast(query):
+        barrier.wait()
+        return "fast " + query
+
+    tools = [
+        Tool(name="slow", func=slow, description="slow tool"),
+        Tool(name="fast", func=fast, description="fast tool"),
+    ]
+    actions = [AgentAction("slow", "a", ""), AgentAction("fast", "b", "")]
+    steps = _take_step(tools, actions)
+    assert [action for action, _ in steps] == actions
+    assert [observation for _, observation in steps] == ["slow a", "fast b"]
+
+
+def test_parallel_executor_isolates_failing_tool():
+    def fail(query):
+        raise ValueError("boom")
+
+    tools = [
+        Tool(name="fail", func=fail, description="failing tool"),
+        Tool(name="echo", func=lambda query: query, description="echo tool"),
+    ]
+    actions = [AgentAction("fail", "a", ""), AgentAction("echo", "b", "")]
+    steps = _take_step(tools, actions)
+    assert [observation for _, observation in steps] == ["ValueError: boom", "b"]
+
+
+def test_parallel_executor_runs_single_action_inline():
+    threads = []
+
+    def record(query):
+        threads.append(threading.current_thread())
+        return query
+
+    tools = [Tool(name="record", func=record, description="recording tool")]
+    steps = _take_step(tools, [AgentAction("record", "a", "")])
+    assert [observation for _, observation in steps] == ["a"]
+    assert threads == [threading.current_thread()]
+
+
+def test_async_executor_runs_sync_tools_in_pool():
+    threads = []
+
+    def record(query):
+        threads.append(threading.current_thread().name)
+        return query
+
+    tool = Tool(name="record", func=record, description="recording tool")
+    executor = _build_executor([tool], [AgentAction("record", "a", "")])
+    result = asyncio.run(executor.acall({"input": "question"}))
+    assert result["output"] == ["a"]
+    assert threads[0].startswith("langflow-tool")
+
+    # The wrapper is reused and remembers the tool has no async implementation
+    threaded = executor._get_threaded_tool(tool)
+    assert threaded is not tool
+    assert executor._get_threaded_tool(tool) is threaded
+    assert threaded._sync_only
+
+
+def test_async_executor_leaves_async_tools_unwrapped():
+    async def native(query):
+        return "async " + query
+
+    tool = Tool(
+        name="native", func=lambda query: query, coroutine=native, description="t"
+    )
+    executor = _build_executor([tool], [AgentAction("native", "a", "")])
+    assert executor._get_threaded_tool(tool) is tool
+    result = asyncio.run(executor.acall({"input": "question"}))
+    assert result["output"] == ["async a"]
+
+
+def test_async_callbacks_reach_threaded_tool():
+    llm = FakeListLLM(responses=["answer"])
+
+    def ask(query, callbacks=None):
+        return llm(query, callbacks=callbacks)
+
+    tool = Tool(name="ask", func=ask, description="asks the llm")
+    executor = _build_executor([tool], [AgentAction("ask", "a", "")])
+    handler = RecordingHandler()
+    result = asyncio.run(executor.acall({"input": "question"}, callbacks=[handler]))
+    assert result["output"] == ["answer"]
+    # on_llm_start is sent from the worker thread running the tool
+    assert handler.events == ["on_tool_start", "on_llm_start"]